@@ -5,7 +5,11 @@ app = dash.Dash(
     __name__,
     external_stylesheets=[dbc.themes.FLATLY],
     title="UofT Research Dashboard",
-    suppress_callback_exceptions=True
+    suppress_callback_exceptions=True,
+    # gzip callback responses via flask-compress — tab payloads are large,
+    # repetitive JSON that compresses extremely well. Serialization itself
+    # goes through plotly's to_json, which picks up orjson automatically.
+    compress=True
 )
 server = app.server  # For deployment
 
@@ -1,14 +1,21 @@
 # dashboard/callbacks.py
 
-from dash import Input, Output, callback, html, dcc, dash_table
+from dash import Input, Output, State, callback, html, dcc, dash_table
 import dash_bootstrap_components as dbc
+import functools
+import numpy as np
+import pandas as pd
 
 from dashboard.components.summary_stats import render_summary_tab, build_kpi_cards
 from dashboard.components.trend_charts import render_trends_tab
 from dashboard.components.map_view import render_map_tab
 from dashboard.components.network_view import render_network_tab, build_node_info_panel
 from dashboard.components.network_view import render_network_tab, build_node_info_panel, _build_cytoscape_elements
-from etl.load import load_all
+from dashboard.layout import DEFAULT_YEAR_RANGE
+from etl.load import (
+    load_all, aggregate_edges, build_concept_index, build_work_country_map,
+    filter_edges_to_works, load_default_figures,
+)
 
 
 # ── Load data once at module import time ─────────────────────────────────────
@@ -17,40 +24,96 @@ from etl.load import load_all
 # no repeated disk reads per request.
 works, country_edges, institution_edges = load_all()
 
+# Collapse the edge tables to per-(work, partner) counts once — every
+# callback aggregation only needs those, so filtering touches far fewer rows.
+country_edges, institution_edges = aggregate_edges(country_edges, institution_edges)
+
+# work_id -> set of partner countries, so the KPI country count walks only
+# the filtered ids instead of scanning the full edge table per render.
+work2countries = build_work_country_map(country_edges)
+
+# Sparse works × concepts membership (COO form): parallel int32 arrays of
+# row positions and concept codes, so a concept filter is one np.isin pass.
+concept_to_code, concept_rows, concept_codes = build_concept_index(works)
+
+# Index the edge tables by work_id (kept as a column too — some aggregations
+# still group on it). Filtering edges down to the current works slice becomes
+# a sorted index intersection instead of rebuilding an isin() hash set of all
+# filtered ids on every single callback.
+country_edges = country_edges.set_index("work_id", drop=False).sort_index()
+institution_edges = institution_edges.set_index("work_id", drop=False).sort_index()
+
 
 # ── Shared filter helper ──────────────────────────────────────────────────────
 
 # Inside dashboard/callbacks.py
 
-def apply_filters(year_range, selected_concepts, types, oa):
+def _filter_key(year_range, selected_concepts, types, oa):
+    """Normalises the sidebar inputs into a hashable, order-independent key."""
+    return (
+        tuple(year_range),
+        tuple(sorted(selected_concepts or [])),
+        tuple(sorted(types or [])),
+        tuple(oa or []),
+    )
+
+
+_DEFAULT_FILTER_KEY = _filter_key(DEFAULT_YEAR_RANGE, None, None, None)
+
+
+@functools.lru_cache(maxsize=32)
+def _filtered_index(key):
     """
-    Returns a filtered slice of the works DataFrame based on sidebar inputs.
-    All callback functions call this before doing anything else.
+    Computes the index of works matching a filter key. Cached so that the
+    three callbacks firing on every sidebar change (KPIs, tab content,
+    network elements) share one filtering pass instead of each redoing it.
     """
-    # 1. Filter by Year
-    filtered = works[
+    year_range, selected_concepts, types, oa = key
+
+    # 1. Filter by Year (copy=True: pandas hands back a read-only view here)
+    mask = (
         (works["year"] >= year_range[0]) & (works["year"] <= year_range[1])
-    ].copy()
+    ).to_numpy(copy=True)
 
-    # 2. Filter by Concepts (Checking inside the nested dictionaries)
+    # 2. Filter by Concepts (against the flat sparse membership index)
     if selected_concepts:
-        # Create a boolean mask: True if any selected concept matches a concept name in the row's list
-        mask = filtered["all_top_concepts"].apply(
-            lambda concept_list: any(
-                c["name"] in selected_concepts for c in concept_list
-            ) if isinstance(concept_list, list) else False
+        sel = np.array(
+            [concept_to_code[c] for c in selected_concepts if c in concept_to_code],
+            dtype=np.int32,
         )
-        filtered = filtered[mask]
+        concept_mask = np.zeros(len(works), dtype=bool)
+        if len(sel):
+            concept_mask[concept_rows[np.isin(concept_codes, sel)]] = True
+        mask &= concept_mask
 
     # 3. Filter by Publication Type
     if types:
-        filtered = filtered[filtered["type"].isin(types)]
-        
+        mask &= works["type"].isin(types).to_numpy()
+
     # 4. Filter by Open Access Status
-    if "oa" in (oa or []):
-        filtered = filtered[filtered["is_oa"] == True]
+    if "oa" in oa:
+        mask &= (works["is_oa"] == True).to_numpy()
+
+    return works.index[mask]
+
+
+@functools.lru_cache(maxsize=32)
+def _filtered_work_ids(key):
+    """
+    The filtered works' id column for a filter key. The tab renderers and
+    the network-elements callback all slice an edge table by these ids and
+    fire on the same sidebar change, so extract the column once and share it.
+    """
+    return works.loc[_filtered_index(key), "id"]
 
-    return filtered
+
+def apply_filters(year_range, selected_concepts, types, oa):
+    """
+    Returns the index of works matching the sidebar inputs. Callbacks
+    resolve rows via works.loc[...] only when they actually need column
+    data, so a filter change no longer copies the full frame per callback.
+    """
+    return _filtered_index(_filter_key(year_range, selected_concepts, types, oa))
 
 
 # ── KPI Cards ─────────────────────────────────────────────────────────────────
@@ -65,9 +128,16 @@ def apply_filters(year_range, selected_concepts, types, oa):
     ]
 )
 def update_kpis(year_range, concepts, types, oa):
-    filtered = apply_filters(year_range, concepts, types, oa)
+    return _kpi_cards(_filter_key(year_range, concepts, types, oa))
+
+
+@functools.lru_cache(maxsize=32)
+def _kpi_cards(key):
+    """KPI cards are a pure function of the filter state, same as the tab
+    content — cache them per key so revisiting a filter skips the stats."""
+    filtered = works.loc[_filtered_index(key)]
     # Delegates to summary_stats.py which owns the card rendering logic
-    return build_kpi_cards(filtered, country_edges)
+    return build_kpi_cards(filtered, work2countries)
 
 
 # ── Tab Content ───────────────────────────────────────────────────────────────
@@ -83,16 +153,30 @@ def update_kpis(year_range, concepts, types, oa):
     ]
 )
 def render_tab(active_tab, year_range, concepts, types, oa):
-    filtered = apply_filters(year_range, concepts, types, oa)
+    return _render_tab_content(active_tab, _filter_key(year_range, concepts, types, oa))
+
+
+@functools.lru_cache(maxsize=64)
+def _render_tab_content(active_tab, key):
+    """
+    Builds (and caches) one tab's content for a given filter state. Every
+    chart in a tab is a pure function of (tab, filter key, loaded data), so
+    switching back to a recently viewed tab/filter combination skips all
+    pandas and Plotly work and goes straight to serialization.
+    """
+    filtered = works.loc[_filtered_index(key)]
 
     if active_tab == "overview":
-        return render_summary_tab(filtered, country_edges)
+        # Landing view: when the filters sit at their defaults, serve the
+        # figures refresh already baked to disk — same for every session
+        prebuilt = load_default_figures() if key == _DEFAULT_FILTER_KEY else None
+        return render_summary_tab(filtered, country_edges, prebuilt=prebuilt)
     elif active_tab == "trends":
         return render_trends_tab(filtered)
     elif active_tab == "map":
-        return render_map_tab(filtered, country_edges)
+        return render_map_tab(filtered, country_edges, work_ids=_filtered_work_ids(key))
     elif active_tab == "network":
-        return render_network_tab(institution_edges, filtered)
+        return render_network_tab(institution_edges, filtered, work_ids=_filtered_work_ids(key))
     elif active_tab == "table":
         return render_data_table(filtered)
 
@@ -102,18 +186,94 @@ def render_tab(active_tab, year_range, concepts, types, oa):
 # ── Data Table Tab ────────────────────────────────────────────────────────────
 # Defined here rather than in a component file because it's simple enough
 # to not warrant its own module — it's just a styled DataTable.
+# Paging/sorting/filtering run server-side so only the visible page is ever
+# serialized to the browser instead of the full filtered dataset.
 
-def render_data_table(filtered):
-    if filtered.empty:
-        return html.Div("No data matches the current filters.", className="text-muted p-4")
+TABLE_PAGE_SIZE = 20
 
+# Operator table for DataTable's filter_query syntax (standard Dash recipe)
+_TABLE_OPERATORS = [
+    ["ge ", ">="], ["le ", "<="], ["lt ", "<"], ["gt ", ">"],
+    ["ne ", "!="], ["eq ", "="],
+    ["contains "],
+    ["datestartswith "],
+]
+
+
+def _split_filter_part(filter_part):
+    """Parses one `{column} op value` clause of a DataTable filter_query."""
+    for operator_type in _TABLE_OPERATORS:
+        for op in operator_type:
+            if op in filter_part:
+                name_part, value_part = filter_part.split(op, 1)
+                name = name_part[name_part.find("{") + 1 : name_part.rfind("}")]
+                value_part = value_part.strip()
+                v0 = value_part[0] if value_part else ""
+                if v0 and v0 == value_part[-1] and v0 in ("'", '"', "`"):
+                    value = value_part[1:-1].replace("\\" + v0, v0)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+
+def _table_columns(filtered):
+    """Display columns that actually exist (guards against schema changes)."""
     display_cols = ["title", "year", "type", "top_concept",
                     "cited_by_count", "is_oa", "oa_status",
                     "author_count", "source_name"]
-    
-    # Only show columns that actually exist (guards against schema changes)
-    available = [c for c in display_cols if c in filtered.columns]
-    table_df = filtered[available].copy()
+    return [c for c in display_cols if c in filtered.columns]
+
+
+def _table_page(table_df, page_current, page_size, sort_by, filter_query):
+    """
+    Applies the DataTable's own filter/sort state server-side and returns
+    (records, page_count) for just the requested page.
+    """
+    dff = table_df
+    if filter_query:
+        for part in filter_query.split(" && "):
+            col, op, value = _split_filter_part(part)
+            if col is None or col not in dff.columns:
+                continue
+            if op in ("eq", "ne", "lt", "le", "gt", "ge"):
+                series = dff[col]
+                # Ordered comparisons raise on categorical/text columns
+                # (type, oa_status, source_name) and on numeric columns fed
+                # a non-numeric value (e.g. typing "> abc" into the year
+                # box) — compare as strings in both cases, matching
+                # filter_action="native"'s lenient behavior
+                if not (pd.api.types.is_numeric_dtype(series)
+                        and isinstance(value, float)):
+                    series = series.astype(str)
+                    value = str(value)
+                dff = dff.loc[getattr(series, op)(value)]
+            elif op == "contains":
+                dff = dff.loc[dff[col].astype(str).str.contains(str(value), case=False, na=False)]
+            elif op == "datestartswith":
+                dff = dff.loc[dff[col].astype(str).str.startswith(str(value))]
+
+    if sort_by:
+        dff = dff.sort_values(
+            [s["column_id"] for s in sort_by],
+            ascending=[s["direction"] == "asc" for s in sort_by],
+        )
+
+    page_count = max(1, -(-len(dff) // page_size))
+    page = dff.iloc[page_current * page_size:(page_current + 1) * page_size]
+    return page.to_dict("records"), page_count
+
+
+def render_data_table(filtered):
+    if filtered.empty:
+        return html.Div("No data matches the current filters.", className="text-muted p-4")
+
+    available = _table_columns(filtered)
+    table_df = filtered[available]
+    records, page_count = _table_page(table_df, 0, TABLE_PAGE_SIZE, None, None)
 
     # Human-readable column labels
     col_labels = {
@@ -129,15 +289,20 @@ def render_data_table(filtered):
             className="text-muted small mb-2"
         ),
         dash_table.DataTable(
-            data=table_df.to_dict("records"),
+            id="works-table",
+            data=records,
             columns=[
                 {"name": col_labels.get(c, c), "id": c}
                 for c in available
             ],
-            sort_action="native",
-            filter_action="native",       # adds per-column search boxes
-            page_size=20,
-            page_action="native",
+            sort_action="custom",
+            sort_by=[],
+            filter_action="custom",       # adds per-column search boxes
+            filter_query="",
+            page_size=TABLE_PAGE_SIZE,
+            page_action="custom",
+            page_current=0,
+            page_count=page_count,
             style_table={"overflowX": "auto"},
             style_cell={
                 "fontSize": "12px",
@@ -157,17 +322,38 @@ def render_data_table(filtered):
                 {"if": {"filter_query": "{is_oa} = True"},
                  "backgroundColor": "#E8F5E9", "color": "#2E7D32"},
             ],
-            tooltip_data=[
-                {
-                    "title": {"value": str(row.get("title", "")), "type": "markdown"}
-                }
-                for row in table_df.to_dict("records")
-            ],
-            tooltip_duration=None,
+            # No tooltip_data: it duplicated every title in the payload —
+            # the cell ellipsis truncation covers long titles instead
         )
     ])
 
 
+@callback(
+    Output("works-table", "data"),
+    Output("works-table", "page_count"),
+    [
+        Input("works-table", "page_current"),
+        Input("works-table", "page_size"),
+        Input("works-table", "sort_by"),
+        Input("works-table", "filter_query"),
+    ],
+    [
+        State("year-slider", "value"),
+        State("concept-filter", "value"),
+        State("type-filter", "value"),
+        State("oa-filter", "value"),
+    ],
+    prevent_initial_call=True
+)
+def update_table_page(page_current, page_size, sort_by, filter_query,
+                      year_range, concepts, types, oa):
+    """Serves one page of the data table; fired by paging/sorting/filtering."""
+    filtered = works.loc[apply_filters(year_range, concepts, types, oa)]
+    table_df = filtered[_table_columns(filtered)]
+    return _table_page(table_df, page_current or 0, page_size or TABLE_PAGE_SIZE,
+                       sort_by, filter_query)
+
+
 # ── Network Graph Interactivity ───────────────────────────────────────────────
 
 @callback(
@@ -183,7 +369,18 @@ def update_node_info(tap_data):
     Input("network-layout-selector", "value")
 )
 def update_network_layout(layout_name):
-    return {"name": layout_name, "animate": True, "animationDuration": 600}
+    layout = {"name": layout_name, "animate": True, "animationDuration": 600}
+    if layout_name == "fcose":
+        # fCoSE skips a chunk of force calculations with uniform node
+        # dimensions, and handles disconnected components separately
+        layout.update({
+            "uniformNodeDimensions": True,
+            "packComponents": True,
+            "quality": "default",
+            "nodeRepulsion": 8000,
+            "idealEdgeLength": 100,
+        })
+    return layout
 
 @callback(
     Output("institution-network", "elements"),
@@ -199,5 +396,15 @@ def update_network_layout(layout_name):
 )
 def update_network_elements(top_n, year_range, concepts, types, oa):
     """Listens to the slider and updates the nodes/edges dynamically."""
-    filtered = apply_filters(year_range, concepts, types, oa)
-    return _build_cytoscape_elements(institution_edges, filtered, top_n)
\ No newline at end of file
+    return _network_elements(top_n, _filter_key(year_range, concepts, types, oa))
+
+
+@functools.lru_cache(maxsize=64)
+def _network_elements(top_n, key):
+    """Element lists are pure functions of (top_n, filter state) — cached so
+    dragging the slider back to a recent value is a dict lookup."""
+    # Only the matching work ids are needed to slice the edge table — shared
+    # with the tab renderers via the per-filter-key cache
+    work_ids = _filtered_work_ids(key)
+    filtered_edges = filter_edges_to_works(institution_edges, work_ids)
+    return _build_cytoscape_elements(filtered_edges, top_n)
\ No newline at end of file
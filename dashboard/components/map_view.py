@@ -6,44 +6,43 @@ from dash import dcc, html
 import dash_bootstrap_components as dbc
 import pycountry
 
-def _iso2_to_iso3(code: str) -> str | None:
-    try:
-        country = pycountry.countries.get(alpha_2=code.upper())
-        return country.alpha_3 if country else None
-    except Exception:
-        return None
-
-def _prepare_map_data(works_df: pd.DataFrame, country_edges_df: pd.DataFrame, agg_metric: str = "works"):
-    filtered_edges = country_edges_df[
-        country_edges_df["work_id"].isin(works_df["id"])
-    ].copy()
+from etl.load import filter_edges_to_works
 
+# One-time lookup tables. pycountry.countries.get() walks its internal
+# indices on every call, which adds up fast when applied per row on each
+# map render — a plain dict .map() is a C-level lookup instead.
+ISO2_TO_ISO3 = {c.alpha_2: c.alpha_3 for c in pycountry.countries}
+ISO2_TO_NAME = {c.alpha_2: c.name for c in pycountry.countries}
+ISO3_TO_NAME = {c.alpha_3: c.name for c in pycountry.countries}
+
+def _prepare_map_data(filtered_edges: pd.DataFrame, agg_metric: str = "works"):
     if filtered_edges.empty:
         return pd.DataFrame(), ""
 
-    # Aggregating by country only, removing year for speed and stability
+    # Aggregating by country only, removing year for speed and stability.
+    # The edges table is pre-collapsed to one row per (work, country), so a
+    # plain value_counts IS the works-per-country count — no groupby needed.
     if agg_metric == "works":
-        agg = filtered_edges.groupby(["country_code"]).size().reset_index(name="value")
-        agg.rename(columns={"value": "Co-authored Works"}, inplace=True)
+        counts = filtered_edges["country_code"].value_counts()
+        counts = counts[counts > 0]  # value_counts lists every category on categoricals
+        agg = counts.rename_axis("country_code").reset_index(name="Co-authored Works")
         value_col = "Co-authored Works"
     else:
         agg = filtered_edges.groupby(["country_code"])["work_id"].nunique().reset_index(name="Unique Works")
         value_col = "Unique Works"
 
-    agg["iso3"] = agg["country_code"].apply(_iso2_to_iso3)
+    agg["iso3"] = agg["country_code"].astype(str).str.upper().map(ISO2_TO_ISO3)
     agg = agg.dropna(subset=["iso3"])
 
-    # Map country names efficiently
-    agg["country_name"] = agg["iso3"].apply(
-        lambda c: pycountry.countries.get(alpha_3=c).name if pycountry.countries.get(alpha_3=c) else c
-    )
+    # Map country names efficiently (fall back to the code if unknown)
+    agg["country_name"] = agg["iso3"].map(ISO3_TO_NAME).fillna(agg["iso3"])
 
     return agg, value_col
 
-def build_choropleth(works_df: pd.DataFrame, country_edges_df: pd.DataFrame) -> go.Figure:
+def build_choropleth(filtered_edges: pd.DataFrame) -> go.Figure:
     """Static choropleth map optimized for performance."""
-    agg, value_col = _prepare_map_data(works_df, country_edges_df, agg_metric="works")
-    
+    agg, value_col = _prepare_map_data(filtered_edges, agg_metric="works")
+
     if agg.empty:
         return _empty_figure("No collaboration data available for this filter selection.")
 
@@ -73,24 +72,25 @@ def build_choropleth(works_df: pd.DataFrame, country_edges_df: pd.DataFrame) ->
     
     return fig
 
-def build_top_countries_bar(works_df: pd.DataFrame, country_edges_df: pd.DataFrame, top_n: int = 20) -> go.Figure:
+def build_top_countries_bar(filtered_edges: pd.DataFrame, top_n: int = 20) -> go.Figure:
     """Static horizontal bar chart of the top N collaborating countries."""
-    filtered_edges = country_edges_df[country_edges_df["work_id"].isin(works_df["id"])]
-    
     if filtered_edges.empty:
         return _empty_figure("No collaboration data.")
 
+    # One row per (work, country) in the collapsed table, so value_counts
+    # gives works per country directly
+    counts = filtered_edges["country_code"].value_counts()
     counts = (
-        filtered_edges.groupby("country_code")
-        .size()
+        counts[counts > 0]
+        .rename_axis("country_code")
         .reset_index(name="works")
         .sort_values("works", ascending=True)
         .tail(top_n)
     )
 
-    counts["country_name"] = counts["country_code"].apply(
-        lambda c: pycountry.countries.get(alpha_2=c).name
-        if pycountry.countries.get(alpha_2=c) else c
+    counts["country_name"] = (
+        counts["country_code"].astype(str).str.upper().map(ISO2_TO_NAME)
+        .fillna(counts["country_code"])
     )
 
     fig = px.bar(
@@ -117,11 +117,19 @@ def _empty_figure(message: str) -> go.Figure:
     fig.update_layout(template="plotly_white", height=400)
     return fig
 
-def render_map_tab(works_df: pd.DataFrame, country_edges_df: pd.DataFrame) -> html.Div:
-    """Full layout for the Collaboration Map tab."""
+def render_map_tab(works_df: pd.DataFrame, country_edges_df: pd.DataFrame,
+                   work_ids=None) -> html.Div:
+    """Full layout for the Collaboration Map tab. Callers that already hold
+    the filtered id column can pass it as work_ids to skip re-extracting it."""
     if works_df.empty:
         return html.Div("No data matches the current filters.", className="text-muted p-4")
 
+    # Filter the edge table down to the current works slice once and share
+    # the result between the choropleth and the bar chart
+    if work_ids is None:
+        work_ids = works_df["id"]
+    filtered_edges = filter_edges_to_works(country_edges_df, work_ids)
+
     return html.Div([
         dbc.Row([
             dbc.Col(html.P(
@@ -133,7 +141,7 @@ def render_map_tab(works_df: pd.DataFrame, country_edges_df: pd.DataFrame) -> ht
         dbc.Row([
             dbc.Col(
                 dcc.Graph(
-                    figure=build_choropleth(works_df, country_edges_df),
+                    figure=build_choropleth(filtered_edges),
                     config={"displayModeBar": True, "scrollZoom": True}
                 ),
                 width=12
@@ -141,7 +149,7 @@ def render_map_tab(works_df: pd.DataFrame, country_edges_df: pd.DataFrame) -> ht
         ], className="mb-4"),
         dbc.Row([
             dbc.Col(
-                dcc.Graph(figure=build_top_countries_bar(works_df, country_edges_df)),
+                dcc.Graph(figure=build_top_countries_bar(filtered_edges)),
                 width=12
             )
         ])
@@ -1,4 +1,7 @@
 # dashboard/components/network_view.py
+import math
+
+import numpy as np
 import pandas as pd
 import dash_cytoscape as cyto
 from dash import dcc, html
@@ -6,6 +9,8 @@ import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
 
+from etl.load import filter_edges_to_works
+
 # Register Cytoscape layout algorithms
 cyto.load_extra_layouts()
 
@@ -13,24 +18,20 @@ UOFT_NODE_ID = "University of Toronto"
 
 
 def _build_cytoscape_elements(
-    institution_edges_df: pd.DataFrame,
-    works_df: pd.DataFrame,
+    filtered: pd.DataFrame,
     top_n: int = 20  # <-- Changed default to 20
 ) -> list:
     """
-    Builds the list of Cytoscape node and edge elements.
+    Builds the list of Cytoscape node and edge elements from an edge table
+    already filtered to the current works slice.
     Nodes are institutions; dynamically scaled by relative co-authorship volume.
     """
-    filtered = institution_edges_df[
-        institution_edges_df["work_id"].isin(works_df["id"])
-    ]
-
     if filtered.empty:
         return []
 
     edge_agg = (
-        filtered.groupby(["source", "target", "target_country"])
-        .size()
+        filtered.groupby(["source", "target", "target_country"], sort=False, observed=True)["n"]
+        .sum()
         .reset_index(name="weight")
         .sort_values("weight", ascending=False)
     )
@@ -40,18 +41,19 @@ def _build_cytoscape_elements(
 
     # --- THE DYNAMIC SIZING FIX ---
     # Find the bounds of our current data slice
-    max_weight = edge_agg["weight"].max()
-    min_weight = edge_agg["weight"].min()
-    
+    weights = edge_agg["weight"].to_numpy()
+    max_weight = weights.max()
+    min_weight = weights.min()
+
     # Define our visual pixel bounds (smallest node vs largest node)
     MIN_PX = 15
     MAX_PX = 65
 
-    def calculate_node_size(w):
-        if max_weight == min_weight: # Fallback if all institutions have the exact same count
-            return (MIN_PX + MAX_PX) / 2
-        # Min-Max Normalization formula
-        return MIN_PX + ((w - min_weight) / (max_weight - min_weight)) * (MAX_PX - MIN_PX)
+    if max_weight == min_weight:  # Fallback if all institutions have the exact same count
+        sizes = np.full(len(weights), (MIN_PX + MAX_PX) / 2)
+    else:
+        # Min-Max Normalization formula, one vectorized pass for all nodes
+        sizes = MIN_PX + (weights - min_weight) / (max_weight - min_weight) * (MAX_PX - MIN_PX)
     # ------------------------------
 
     elements = []
@@ -63,36 +65,66 @@ def _build_cytoscape_elements(
     })
     seen_nodes.add(UOFT_NODE_ID)
 
-    for _, row in edge_agg.iterrows():
-        if row["target"] not in seen_nodes:
+    # Plain zip over raw ndarrays — iterrows would box every row into a
+    # Series, which is by far the slowest way to walk a DataFrame.
+    for target, country, weight, size in zip(
+        edge_agg["target"].to_numpy(),
+        edge_agg["target_country"].to_numpy(),
+        weights, sizes,
+    ):
+        if target not in seen_nodes:
             elements.append({
                 "data": {
-                    "id": row["target"],
-                    "label": row["target"],
-                    "country": row.get("target_country", ""),
-                    
-                    # Apply the dynamic scaling function
-                    "size": calculate_node_size(row["weight"]),
-                    
-                    "works_count": int(row["weight"]),
+                    "id": target,
+                    "label": target,
+                    "country": country if country is not None else "",
+                    "size": float(size),
+                    "works_count": int(weight),
                     "type": "institution"
                 },
                 "classes": "institution"
             })
-            seen_nodes.add(row["target"])
+            seen_nodes.add(target)
 
         elements.append({
             "data": {
                 "source": UOFT_NODE_ID,
-                "target": row["target"],
-                "weight": int(row["weight"]),
-                "label": str(int(row["weight"]))
+                "target": target,
+                "weight": int(weight),
+                "label": str(int(weight))
             }
         })
 
+    _preset_positions(elements)
     return elements
 
 
+def _preset_positions(elements):
+    """
+    Precomputes node coordinates server-side so the browser can use the
+    'preset' layout instead of running a force simulation on its single JS
+    thread. The graph is a pure hub-and-spoke star, so no solver is needed:
+    hub in the centre, institutions on a golden-angle spiral with the
+    heaviest collaborators closest (element order is already weight-desc).
+    """
+    GOLDEN_ANGLE = 2.39996  # radians; gives an even sunflower spread
+
+    i = 0
+    for element in elements:
+        if "source" in element["data"]:  # edges carry no position
+            continue
+        if element["data"].get("type") == "hub":
+            element["position"] = {"x": 0, "y": 0}
+            continue
+        radius = 130 + 40 * math.sqrt(i)
+        angle = i * GOLDEN_ANGLE
+        element["position"] = {
+            "x": round(radius * math.cos(angle), 1),
+            "y": round(radius * math.sin(angle), 1),
+        }
+        i += 1
+
+
 def _cytoscape_stylesheet() -> list:
     return [
         # Hub node
@@ -123,17 +155,20 @@ def _cytoscape_stylesheet() -> list:
                 "text-halign": "center",
                 "color": "#333",
                 "text-wrap": "wrap",
-                "text-max-width": "80px"
+                "text-max-width": "80px",
+                # Skip label painting entirely when zoomed far out
+                "min-zoomed-font-size": 8
             }
         },
-        # Edges
+        # Edges — haystack is the cheapest curve style to paint and looks
+        # identical to bezier on a star graph with no parallel edges
         {
             "selector": "edge",
             "style": {
                 "width": "mapData(weight, 1, 50, 1, 8)",
                 "line-color": "#ccc",
                 "opacity": 0.7,
-                "curve-style": "bezier"
+                "curve-style": "haystack"
             }
         },
         # Hover highlight
@@ -153,30 +188,38 @@ def _cytoscape_stylesheet() -> list:
 
 
 def build_network_graph(
-    institution_edges_df: pd.DataFrame,
-    works_df: pd.DataFrame,
+    filtered_edges: pd.DataFrame,
     top_n: int = 40,
-    layout: str = "cose"
+    layout: str = "preset"
 ) -> cyto.Cytoscape:
 
     """
     Returns a Dash Cytoscape component (the network graph).
-    layout options: 'cose' (force-directed), 'circle', 'concentric', 'breadthfirst'
+    layout options: 'preset' (server-side precomputed), 'cose'
+    (force-directed), 'circle', 'concentric', 'breadthfirst'
     """
-    elements = _build_cytoscape_elements(institution_edges_df, works_df, top_n)
+    elements = _build_cytoscape_elements(filtered_edges, top_n)
 
-    
-    return cyto.Cytoscape(
-        id="institution-network",
-        elements=elements,
-        layout={
+    if layout == "preset":
+        layout_opts = {"name": "preset", "animate": False}
+    else:
+        layout_opts = {
             "name": layout,
             "animate": False,          # <-- TURN THIS OFF
             "animationDuration": 0,    # <-- SET TO ZERO
+            # fCoSE-family options: skip per-node dimension force work and
+            # lay out any disconnected components separately
+            "uniformNodeDimensions": True,
+            "packComponents": True,
             "nodeRepulsion": 8000,
             "idealEdgeLength": 100,
             "gravity": 0.25
-        },
+        }
+
+    return cyto.Cytoscape(
+        id="institution-network",
+        elements=elements,
+        layout=layout_opts,
         stylesheet=_cytoscape_stylesheet(),
         style={"width": "100%", "height": "580px", "background": "#FAFAFA"},
         minZoom=0.3,
@@ -186,25 +229,22 @@ def build_network_graph(
 
 
 def build_top_institutions_bar(
-    institution_edges_df: pd.DataFrame,
-    works_df: pd.DataFrame,
+    filtered: pd.DataFrame,
     top_n: int = 20
 ) -> go.Figure:
     """
     Horizontal bar chart: top N partner institutions by number of co-authored works.
-    Complements the network graph with precise counts.
+    Takes the pre-filtered edge table; complements the network graph with
+    precise counts.
     """
-    filtered = institution_edges_df[
-        institution_edges_df["work_id"].isin(works_df["id"])
-    ]
     if filtered.empty:
         fig = go.Figure()
         fig.add_annotation(text="No data.", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False)
         return fig
 
     counts = (
-        filtered.groupby(["target", "target_country"])
-        .size()
+        filtered.groupby(["target", "target_country"], sort=False, observed=True)["n"]
+        .sum()
         .reset_index(name="works")
         .sort_values("works", ascending=True)
         .tail(top_n)
@@ -254,18 +294,28 @@ def build_node_info_panel(tap_node_data: dict | None) -> html.Div:
 
 def render_network_tab(
     institution_edges_df: pd.DataFrame,
-    works_df: pd.DataFrame
+    works_df: pd.DataFrame,
+    work_ids=None
 ) -> html.Div:
     """
     Full layout for the Network Graph tab.
     Left: Cytoscape graph. Right: node info panel + controls.
     Bottom: top institutions bar chart.
+    Callers that already hold the filtered id column can pass it as
+    work_ids to skip re-extracting it.
     """
     if works_df.empty:
         return html.Div("No data matches the current filters.", className="text-muted p-4")
 
+    # Filter the edge table down to the current works slice once and share
+    # the result between the graph and the bar chart
+    if work_ids is None:
+        work_ids = works_df["id"]
+    filtered_edges = filter_edges_to_works(institution_edges_df, work_ids)
+
     layout_options = [
-        {"label": "Force-directed (CoSE)",  "value": "cose"},
+        {"label": "Precomputed (fastest)",   "value": "preset"},
+        {"label": "Force-directed (fCoSE)", "value": "fcose"},
         {"label": "Circle",                  "value": "circle"},
         {"label": "Concentric",              "value": "concentric"},
         {"label": "Breadth-first",           "value": "breadthfirst"},
@@ -287,7 +337,7 @@ def render_network_tab(
                 dcc.Dropdown(
                     id="network-layout-selector",
                     options=layout_options,
-                    value="cose",
+                    value="preset",
                     clearable=False,
                     style={"width": "240px"}
                 )
@@ -306,7 +356,7 @@ def render_network_tab(
         # Graph + info panel
         dbc.Row([
             dbc.Col(
-                build_network_graph(institution_edges_df, works_df),
+                build_network_graph(filtered_edges),
                 md=9
             ),
             dbc.Col(
@@ -318,7 +368,7 @@ def render_network_tab(
         # Bar chart below
         dbc.Row([
             dbc.Col(
-                dcc.Graph(figure=build_top_institutions_bar(institution_edges_df, works_df)),
+                dcc.Graph(figure=build_top_institutions_bar(filtered_edges)),
                 width=12
             )
         ])
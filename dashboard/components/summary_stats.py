@@ -8,7 +8,7 @@ import dash_bootstrap_components as dbc
 
 # ── KPI Cards ────────────────────────────────────────────────────────────────
 
-def build_kpi_cards(works_df: pd.DataFrame, country_edges_df: pd.DataFrame) -> list:
+def build_kpi_cards(works_df: pd.DataFrame, work2countries: dict) -> list:
     """
     Returns a list of dbc.Col KPI cards summarising the filtered dataset.
     Intended to be placed inside a dbc.Row.
@@ -17,11 +17,12 @@ def build_kpi_cards(works_df: pd.DataFrame, country_edges_df: pd.DataFrame) -> l
     avg_citations = round(works_df["cited_by_count"].mean(), 1) if total > 0 else 0
     oa_pct = round(works_df["is_oa"].mean() * 100, 1) if total > 0 else 0
 
-    # Unique collaborating countries — from the pre-built edges table, filtered
-    # to only works present in the current filtered set
-    collab_countries = country_edges_df[
-        country_edges_df["work_id"].isin(works_df["id"])
-    ]["country_code"].nunique()
+    # Unique collaborating countries — union of the precomputed per-work
+    # country sets over just the filtered ids (most works have no edges at
+    # all, so .get with an empty default keeps this a cheap dict walk)
+    collab_countries = len(set().union(
+        *(work2countries.get(i, ()) for i in works_df["id"].to_numpy())
+    )) if total > 0 else 0
 
     metrics = [
         ("Total Publications",       total,             "primary", "bi bi-journal-text"),
@@ -122,13 +123,7 @@ def build_oa_trend_chart(works_df: pd.DataFrame) -> go.Figure:
     """
     Stacked area chart of OA status (gold / green / hybrid / bronze / closed) over time.
     """
-    oa_yearly = (
-        works_df.groupby(["year", "oa_status"])
-        .size()
-        .reset_index(name="count")
-    )
-
-    # Define a consistent color palette
+    # Define a consistent color palette (also fixes the stacking order)
     oa_colors = {
         "gold":   "#F5A623",
         "green":  "#4CAF50",
@@ -137,27 +132,32 @@ def build_oa_trend_chart(works_df: pd.DataFrame) -> go.Figure:
         "closed": "#9E9E9E",
     }
 
-    fig = go.Figure()
-    for status, color in oa_colors.items():
-        subset = oa_yearly[oa_yearly["oa_status"] == status]
-        if subset.empty:
-            continue
-        fig.add_trace(go.Scatter(
-            x=subset["year"], y=subset["count"],
-            name=status.capitalize(),
-            stackgroup="one",
-            fillcolor=color,
-            line=dict(color=color),
-            hovertemplate=f"{status.capitalize()}: %{{y}}<extra></extra>"
-        ))
+    # crosstab is the cheapest two-key count pandas has; trim statuses that
+    # never occur (oa_status is categorical, so every category gets a column)
+    # and keep the canonical palette order
+    ct = pd.crosstab(works_df["year"], works_df["oa_status"])
+    ct = ct.reindex(columns=[s for s in oa_colors if s in ct.columns and ct[s].sum() > 0])
+    oa_yearly = ct.reset_index().melt(
+        id_vars="year", var_name="oa_status", value_name="count"
+    )
+    oa_yearly["oa_status"] = oa_yearly["oa_status"].astype(str).str.capitalize()
+
+    # One px.area call builds all the stacked traces — no per-status mask
+    # scan of the aggregated frame
+    fig = px.area(
+        oa_yearly,
+        x="year", y="count",
+        color="oa_status",
+        color_discrete_map={s.capitalize(): c for s, c in oa_colors.items()},
+        title="Open Access Status Over Time",
+        labels={"count": "Publications", "year": "Year", "oa_status": ""},
+        template="plotly_white",
+    )
 
     fig.update_layout(
-        title="Open Access Status Over Time",
         xaxis=dict(title="Year", tickmode="linear", dtick=2),
-        yaxis=dict(title="Publications"),
         hovermode="x unified",
-        template="plotly_white",
-        
+
         # THE FIX: Move the legend to the bottom center
         legend=dict(
             orientation="h", 
@@ -219,29 +219,43 @@ def build_type_pie_chart(works_df: pd.DataFrame, top_n: int = 5) -> go.Figure:
 
 # ── Layout Assembly ──────────────────────────────────────────────────────────
 
-def render_summary_tab(works_df: pd.DataFrame, country_edges_df: pd.DataFrame) -> html.Div:
+def render_summary_tab(works_df: pd.DataFrame, country_edges_df: pd.DataFrame,
+                       prebuilt: dict = None) -> html.Div:
     """
     Assembles the full Overview tab layout.
     Called from callbacks.py when the Overview tab is active.
+    prebuilt optionally carries figure JSON dicts baked at refresh time
+    (default view only) — dcc.Graph takes those as-is, skipping the
+    pandas/plotly work entirely.
     """
     if works_df.empty:
         return html.Div("No data matches the current filters.", className="text-muted p-4")
 
+    figs = prebuilt or {}
+
     return html.Div([
         # Row 1: annual output (full width)
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=build_annual_output_chart(works_df)), width=12)
+            dbc.Col(dcc.Graph(
+                figure=figs.get("annual_output") or build_annual_output_chart(works_df)
+            ), width=12)
         ], className="mb-4"),
 
         # Row 2: disciplines (left) + OA trend (right)
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=build_discipline_breakdown_chart(works_df)), md=7),
-            dbc.Col(dcc.Graph(figure=build_oa_trend_chart(works_df)), md=5),
+            dbc.Col(dcc.Graph(
+                figure=figs.get("discipline_breakdown") or build_discipline_breakdown_chart(works_df)
+            ), md=7),
+            dbc.Col(dcc.Graph(
+                figure=figs.get("oa_trend") or build_oa_trend_chart(works_df)
+            ), md=5),
         ], className="mb-4"),
 
         # Row 3: publication type donut (left) + simple stats table (right)
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=build_type_pie_chart(works_df)), md=5),
+            dbc.Col(dcc.Graph(
+                figure=figs.get("type_pie") or build_type_pie_chart(works_df)
+            ), md=5),
             dbc.Col(_build_stats_table(works_df), md=7),
         ])
     ])
@@ -254,10 +268,14 @@ def _build_stats_table(works_df: pd.DataFrame) -> dbc.Card:
     if works_df["top_concept"].isna().all():
         return html.Div()
 
+    # Group only the four numeric columns the table shows — grouping the
+    # full frame drags every column (including the nested concept lists)
+    # through the split/apply machinery for nothing
     stats = (
-        works_df.groupby("top_concept")
+        works_df[["top_concept", "cited_by_count", "is_oa", "author_count"]]
+        .groupby("top_concept", sort=False, observed=True)
         .agg(
-            Works=("id", "count"),
+            Works=("cited_by_count", "size"),
             Avg_Citations=("cited_by_count", "mean"),
             Median_Citations=("cited_by_count", "median"),
             OA_Rate=("is_oa", "mean"),
@@ -7,49 +7,88 @@ import dash_bootstrap_components as dbc
 import numpy as np
 
 
+def _shared_aggregates(works_df: pd.DataFrame):
+    """
+    One pass over the filtered frame producing the small per-year and
+    per-(year, discipline) tables every chart in this tab slices from,
+    instead of each builder re-grouping the full frame.
+    """
+    # value_counts on the bare column beats groupby().size() — no frame
+    # split, just one hash pass over the key array
+    yearly_counts = (
+        works_df["year"].value_counts(sort=False).sort_index().reset_index()
+    )
+    yearly_counts.columns = ["year", "count"]
+    year_concept = (
+        works_df.groupby(["year", "top_concept"], observed=True)
+        .agg(count=("id", "count"), avg_citations=("cited_by_count", "mean"))
+        .reset_index()
+    )
+    concept_totals = works_df["top_concept"].value_counts()
+    return yearly_counts, year_concept, concept_totals
+
+
 def build_citation_distribution_chart(works_df: pd.DataFrame) -> go.Figure:
     """
     Box plots of citation counts grouped by discipline.
     Outliers are shown as individual points.
     Capped at 99th percentile to prevent extreme outliers from crushing the chart.
+    Box statistics are computed server-side and fed to go.Box, so the
+    payload scales with the outlier count instead of shipping every row's
+    citation value to the browser.
     """
     cap = works_df["cited_by_count"].quantile(0.99)
-    plot_df = works_df[works_df["top_concept"].notna()].copy()
-    plot_df["cited_by_count_capped"] = plot_df["cited_by_count"].clip(upper=cap)
+    plot_df = works_df.loc[works_df["top_concept"].notna(), ["top_concept", "cited_by_count"]]
+    capped = plot_df["cited_by_count"].clip(upper=cap)
+
+    groups = capped.groupby(plot_df["top_concept"], observed=True)
 
     # Order by median for readability
-    order = (
-        plot_df.groupby("top_concept")["cited_by_count_capped"]
-        .median()
-        .sort_values(ascending=False)
-        .head(15)
-        .index.tolist()
-    )
-    plot_df = plot_df[plot_df["top_concept"].isin(order)]
+    order = groups.median().sort_values(ascending=False).head(15).index.tolist()
+
+    colors = px.colors.qualitative.Pastel
+    fig = go.Figure()
+    for i, concept in enumerate(order):
+        values = groups.get_group(concept).to_numpy()
+        q1, med, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        lo = max(values.min(), q1 - 1.5 * iqr)
+        hi = min(values.max(), q3 + 1.5 * iqr)
+        outliers = values[(values < lo) | (values > hi)]
+        fig.add_trace(go.Box(
+            name=concept,
+            q1=[q1], median=[med], q3=[q3],
+            lowerfence=[lo], upperfence=[hi],
+            # The only raw points sent over the wire are the outliers
+            y=[outliers.tolist()],
+            boxpoints="all",
+            marker=dict(color=colors[i % len(colors)], size=3),
+            fillcolor=colors[i % len(colors)],
+            line=dict(color="#666", width=1),
+            showlegend=False,
+        ))
 
-    fig = px.box(
-        plot_df,
-        x="top_concept", y="cited_by_count_capped",
-        category_orders={"top_concept": order},
+    fig.update_layout(
         title="Citation Distribution by Discipline (capped at 99th pct.)",
-        labels={"top_concept": "", "cited_by_count_capped": "Citations"},
+        yaxis=dict(title="Citations"),
         template="plotly_white",
-        color="top_concept",
-        color_discrete_sequence=px.colors.qualitative.Pastel
+        margin=dict(t=60, b=120),
     )
-    fig.update_traces(showlegend=False)
     fig.update_xaxes(tickangle=-35)
-    fig.update_layout(margin=dict(t=60, b=120))
     return fig
 
 
-def build_growth_rate_chart(works_df: pd.DataFrame) -> go.Figure:
+def build_growth_rate_chart(works_df: pd.DataFrame, yearly: pd.DataFrame = None) -> go.Figure:
     """
     Year-over-year publication growth rate (%) as a line chart.
     Useful for spotting research momentum or contraction.
+    Accepts the precomputed per-year counts so callers can share them.
     """
-    yearly = works_df.groupby("year").size().reset_index(name="count")
-    yearly = yearly.sort_values("year")
+    if yearly is None:
+        yearly = works_df["year"].value_counts(sort=False).sort_index().reset_index()
+        yearly.columns = ["year", "count"]
+    else:
+        yearly = yearly.copy()  # the shared table is reused by other charts
     yearly["yoy_growth"] = yearly["count"].pct_change() * 100
 
     fig = go.Figure()
@@ -74,29 +113,36 @@ def build_growth_rate_chart(works_df: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def build_field_share_over_time(works_df: pd.DataFrame, top_n: int = 8) -> go.Figure:
+def build_field_share_over_time(works_df: pd.DataFrame, top_n: int = 8,
+                                year_concept: pd.DataFrame = None,
+                                concept_totals: pd.Series = None) -> go.Figure:
     """
     Normalised stacked area chart showing each discipline's share of
     total annual output. Reveals if UofT is shifting its research focus.
+    Accepts the precomputed per-(year, discipline) counts so callers can
+    share them across charts.
     """
-    top_concepts = (
-        works_df["top_concept"]
-        .value_counts()
-        .head(top_n)
-        .index.tolist()
-    )
-    plot_df = works_df[works_df["top_concept"].isin(top_concepts)].copy()
-    plot_df["top_concept"] = plot_df["top_concept"].where(
-        plot_df["top_concept"].isin(top_concepts), other="Other"
-    )
+    if concept_totals is None:
+        concept_totals = works_df["top_concept"].value_counts()
+    top_concepts = concept_totals.head(top_n).index.tolist()
 
-    share = (
-        plot_df.groupby(["year", "top_concept"])
-        .size()
-        .reset_index(name="count")
+    if year_concept is None:
+        sub = works_df[works_df["top_concept"].isin(top_concepts)]
+        wide = pd.crosstab(sub["year"], sub["top_concept"])
+    else:
+        wide = (
+            year_concept.loc[year_concept["top_concept"].isin(top_concepts)]
+            .pivot(index="year", columns="top_concept", values="count")
+            .fillna(0)
+        )
+
+    # Row-normalise the wide table directly — one div against the row sums
+    # instead of a groupby-transform divisor pass over the long frame.
+    # Shares stay relative to the top-N fields, as before.
+    pct = wide.div(wide.sum(axis=1), axis=0) * 100
+    share = pct.reset_index().melt(
+        id_vars="year", var_name="top_concept", value_name="share_pct"
     )
-    total_per_year = share.groupby("year")["count"].transform("sum")
-    share["share_pct"] = share["count"] / total_per_year * 100
 
     fig = px.area(
         share,
@@ -115,24 +161,31 @@ def build_field_share_over_time(works_df: pd.DataFrame, top_n: int = 8) -> go.Fi
     return fig
 
 
-def build_citation_trend_by_field(works_df: pd.DataFrame, top_n: int = 6) -> go.Figure:
+def build_citation_trend_by_field(works_df: pd.DataFrame, top_n: int = 6,
+                                  year_concept: pd.DataFrame = None,
+                                  concept_totals: pd.Series = None) -> go.Figure:
     """
     Line chart: average citations per work over time, one line per discipline.
     Shows which fields are producing increasingly high-impact research.
+    Accepts the precomputed per-(year, discipline) aggregate so callers can
+    share it across charts.
     """
-    top_concepts = (
-        works_df["top_concept"]
-        .value_counts()
-        .head(top_n)
-        .index.tolist()
-    )
-    plot_df = works_df[works_df["top_concept"].isin(top_concepts)]
+    if concept_totals is None:
+        concept_totals = works_df["top_concept"].value_counts()
+    top_concepts = concept_totals.head(top_n).index.tolist()
 
-    trend = (
-        plot_df.groupby(["year", "top_concept"])["cited_by_count"]
-        .mean()
-        .reset_index()
-    )
+    if year_concept is None:
+        trend = (
+            works_df[works_df["top_concept"].isin(top_concepts)]
+            .groupby(["year", "top_concept"], observed=True)["cited_by_count"]
+            .mean()
+            .reset_index()
+        )
+    else:
+        trend = year_concept.loc[
+            year_concept["top_concept"].isin(top_concepts),
+            ["year", "top_concept", "avg_citations"]
+        ].rename(columns={"avg_citations": "cited_by_count"})
 
     fig = px.line(
         trend,
@@ -152,12 +205,18 @@ def build_citation_trend_by_field(works_df: pd.DataFrame, top_n: int = 6) -> go.
     return fig
 
 
-def build_rolling_avg_chart(works_df: pd.DataFrame, window: int = 3) -> go.Figure:
+def build_rolling_avg_chart(works_df: pd.DataFrame, window: int = 3,
+                            yearly: pd.DataFrame = None) -> go.Figure:
     """
     Publication count per year with a rolling average overlay.
     Smooths out year-to-year noise to show the underlying trend.
+    Accepts the precomputed per-year counts so callers can share them.
     """
-    yearly = works_df.groupby("year").size().reset_index(name="count").sort_values("year")
+    if yearly is None:
+        yearly = works_df["year"].value_counts(sort=False).sort_index().reset_index()
+        yearly.columns = ["year", "count"]
+    else:
+        yearly = yearly.copy()  # the shared table is reused by other charts
     yearly[f"rolling_{window}yr"] = yearly["count"].rolling(window, center=True).mean()
 
     fig = go.Figure()
@@ -195,14 +254,20 @@ def render_trends_tab(works_df: pd.DataFrame) -> html.Div:
     if works_df.empty:
         return html.Div("No data matches the current filters.", className="text-muted p-4")
 
+    # Aggregate once, slice many times — the four trend charts below all
+    # derive from the same per-year / per-(year, discipline) tables
+    yearly_counts, year_concept, concept_totals = _shared_aggregates(works_df)
+
     return html.Div([
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=build_rolling_avg_chart(works_df)), md=6),
-            dbc.Col(dcc.Graph(figure=build_growth_rate_chart(works_df)), md=6),
+            dbc.Col(dcc.Graph(figure=build_rolling_avg_chart(works_df, yearly=yearly_counts)), md=6),
+            dbc.Col(dcc.Graph(figure=build_growth_rate_chart(works_df, yearly=yearly_counts)), md=6),
         ], className="mb-4"),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=build_field_share_over_time(works_df)), md=7),
-            dbc.Col(dcc.Graph(figure=build_citation_trend_by_field(works_df)), md=5),
+            dbc.Col(dcc.Graph(figure=build_field_share_over_time(
+                works_df, year_concept=year_concept, concept_totals=concept_totals)), md=7),
+            dbc.Col(dcc.Graph(figure=build_citation_trend_by_field(
+                works_df, year_concept=year_concept, concept_totals=concept_totals)), md=5),
         ], className="mb-4"),
         dbc.Row([
             dbc.Col(dcc.Graph(figure=build_citation_distribution_chart(works_df)), md=12),
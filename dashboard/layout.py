@@ -1,22 +1,15 @@
 # dashboard/layout.py
 import dash_bootstrap_components as dbc
 from dash import dcc, html
-from etl.load import load_all
+from etl.load import load_filter_options
 
-# Load data using your existing ETL function
-works, _, _ = load_all()
+# The sidebar options are precomputed at refresh time (filters.json) —
+# importing the layout no longer loads and scans the full works table
+years, concepts = load_filter_options()
 
-# Extract unique years and force them to be standard Python ints
-years = sorted([int(y) for y in works["year"].dropna().unique()])
-
-# Extract unique concepts from the nested list of dictionaries
-unique_concepts = set()
-# Drop NAs to prevent errors on rows with no concept data
-for concept_list in works["all_top_concepts"].dropna():
-    for concept in concept_list:
-        unique_concepts.add(concept["name"])
-
-concepts = sorted(list(unique_concepts))
+# Initial slider state — also the filter state the refresh-time prebuilt
+# figures are baked for (see callbacks / etl.refresh)
+DEFAULT_YEAR_RANGE = [2020, 2024]
 
 sidebar = dbc.Card([
     html.H5("Filters", className="card-title"),
@@ -24,9 +17,12 @@ sidebar = dbc.Card([
     dcc.RangeSlider(
         id="year-slider",
         min=min(years), max=max(years),
-        value=[2020, 2024],
+        value=DEFAULT_YEAR_RANGE,
         marks={y: str(y) for y in years if y % 5 == 0},
-        tooltip={"placement": "bottom"}
+        tooltip={"placement": "bottom"},
+        # Fire callbacks on handle release, not per drag tick. This is the
+        # dash default, spelled out so a default change can't regress it
+        updatemode="mouseup"
     ),
     html.Br(),
     html.Label("Discipline / Topic"),
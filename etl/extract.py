@@ -1,6 +1,8 @@
 import pyalex
 from pyalex import Works
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
 from tqdm import tqdm
 import os
 from dotenv import load_dotenv
@@ -9,13 +11,17 @@ pyalex.config.email = os.getenv("OPENALEX_EMAIL") # polite pool
 
 UOFT_ID = "I185261750"
 
-def fetch_works(start_year=2020, end_year=2026, per_page=200):
+def fetch_works(start_year=2020, end_year=2026, per_page=200,
+                path="data/raw/works_raw.parquet"):
     """
-    Fetch all works with at least one UofT author.
-    Returns a list of raw work dicts.
+    Fetch all works with at least one UofT author, streaming each page
+    straight into a parquet writer as it arrives. Memory stays at one page
+    regardless of corpus size, and a crash mid-fetch still leaves every
+    completed page safe on disk. Returns the written path.
     """
-    all_works = []
-    
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
     pager = (
         Works()
         .filter(
@@ -30,8 +36,25 @@ def fetch_works(start_year=2020, end_year=2026, per_page=200):
         ])
         .paginate(per_page=per_page, n_max=None)  # n_max=None = fetch all
     )
-    
-    for page in tqdm(pager, desc="Fetching works"):
-        all_works.extend(page)
-    
-    return all_works
\ No newline at end of file
+
+    writer = None
+    total = 0
+    try:
+        for page in tqdm(pager, desc="Fetching works"):
+            if not page:
+                continue
+            table = pa.Table.from_pylist(page)
+            if writer is None:
+                # First page fixes the schema; every select() field is
+                # present on every record, so later pages cast cleanly
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            total += len(page)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    print(f"[extract] Streamed {total} works to {path}")
+    return path
\ No newline at end of file
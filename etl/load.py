@@ -1,6 +1,11 @@
 # etl/load.py
+import functools
+import gzip
+import json
 import os
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 from pathlib import Path
 
 RAW_DIR = Path("data/raw")
@@ -25,30 +30,240 @@ def save_processed(df: pd.DataFrame, filename: str):
     print(f"[load] Saved {len(df)} rows to {path}")
     return path
 
-def load_processed(filename: str) -> pd.DataFrame:
+def load_processed(filename: str, columns=None) -> pd.DataFrame:
     path = PROCESSED_DIR / filename
     if not path.exists():
         raise FileNotFoundError(
             f"{path} not found. Run etl/refresh.py first to build the data cache."
         )
-    return pd.read_parquet(path)
+    if columns is not None:
+        # Column projection pushed down into the parquet read — skipped
+        # columns' chunks are never decoded. Intersect with the file schema
+        # so requesting a column an older cache lacks doesn't raise.
+        on_disk = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in on_disk]
+    # Read through pyarrow directly (multi-threaded columnar scan), then
+    # convert with self_destruct + split_blocks so the Arrow table's buffers
+    # are handed over column by column instead of briefly holding the whole
+    # dataset twice. Note pandas 3 already stores strings Arrow-backed, and
+    # dtype_backend="pyarrow" is deliberately not used: it would wrap the
+    # nested list columns in ArrowDtype and break the downstream code that
+    # expects plain object cells.
+    table = pq.read_table(path, columns=columns)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def save_default_figures(figures: dict, dirname: str = "figs"):
+    """
+    Persists prebuilt Plotly figures (name -> Figure) as gzipped JSON under
+    data/processed/figs/. The default-view figures are identical for every
+    user and every reload, so refresh bakes them once and the dashboard can
+    serve them with a file read instead of a pandas pass.
+    """
+    ensure_dirs()
+    figs_dir = PROCESSED_DIR / dirname
+    figs_dir.mkdir(parents=True, exist_ok=True)
+    for name, fig in figures.items():
+        with gzip.open(figs_dir / f"{name}.json.gz", "wt", encoding="utf-8") as f:
+            f.write(fig.to_json())
+    print(f"[load] Saved {len(figures)} default figures to {figs_dir}")
+    return figs_dir
+
+@functools.lru_cache(maxsize=1)
+def load_default_figures(dirname: str = "figs") -> dict:
+    """
+    Returns {figure name: plotly JSON dict} for the figures baked by
+    refresh, or an empty dict when none exist (older caches). Cached — the
+    files only change when refresh runs, which restarts the app anyway.
+    """
+    figs_dir = PROCESSED_DIR / dirname
+    out = {}
+    if figs_dir.is_dir():
+        for path in sorted(figs_dir.glob("*.json.gz")):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                out[path.name.removesuffix(".json.gz")] = json.load(f)
+    return out
+
+def _derive_filter_options(works: pd.DataFrame):
+    """Derives the sidebar options (years, concept names) from the works
+    table with explode + json_normalize — no Python loop over nested lists."""
+    years = sorted(int(y) for y in works["year"].dropna().unique())
+    exploded = works["all_top_concepts"].explode().dropna()
+    if len(exploded):
+        concepts = sorted(pd.json_normalize(exploded)["name"].dropna().unique())
+    else:
+        concepts = []
+    return years, concepts
+
+def save_filter_options(works: pd.DataFrame, filename: str = "filters.json"):
+    """Persists the sidebar filter options at refresh time so the layout
+    doesn't have to load and scan the full works table at import."""
+    ensure_dirs()
+    years, concepts = _derive_filter_options(works)
+    path = PROCESSED_DIR / filename
+    path.write_text(json.dumps({"years": years, "concepts": concepts}))
+    print(f"[load] Saved filter options to {path}")
+    return path
+
+@functools.lru_cache(maxsize=1)
+def load_filter_options(filename: str = "filters.json"):
+    """
+    Returns (years, concepts) for the sidebar. Prefers the tiny JSON written
+    by refresh; falls back to deriving from works.parquet for data caches
+    built before filters.json existed. Cached so repeated imports are free.
+    """
+    path = PROCESSED_DIR / filename
+    if path.exists():
+        opts = json.loads(path.read_text())
+        return opts["years"], opts["concepts"]
+    return _derive_filter_options(load_processed("works.parquet"))
+
+def aggregate_edges(country_edges: pd.DataFrame, institution_edges: pd.DataFrame):
+    """
+    Collapses the long edge tables to one row per (work, partner) with a
+    count column "n", keeping only the columns the dashboard aggregates on.
+    The raw tables carry one row per author-level link plus heavy nested
+    concept columns; every map/network render only ever needs the counts.
+    """
+    country_counts = (
+        country_edges.groupby(["work_id", "country_code"], observed=True)
+        .size()
+        .reset_index(name="n")
+    )
+    institution_counts = (
+        institution_edges.groupby(
+            ["work_id", "source", "target", "target_country"], observed=True
+        )
+        .size()
+        .reset_index(name="n")
+    )
+    return country_counts, institution_counts
+
+def build_work_country_map(country_edges: pd.DataFrame) -> dict:
+    """
+    Precomputes work_id -> set of partner country codes. The KPI row only
+    ever needs "how many unique countries across these works", so flipping
+    the lookup this way turns a per-render edge-table scan into a dict walk
+    over just the filtered ids.
+    """
+    # country_code is categorical by the time this runs; agg(set) can't be
+    # cast back to that dtype, so group plain object values instead
+    codes = country_edges["country_code"].astype(object)
+    return codes.groupby(country_edges["work_id"], observed=True).agg(set).to_dict()
+
+def filter_edges_to_works(edges: pd.DataFrame, work_ids) -> pd.DataFrame:
+    """
+    Slices a work_id-indexed edge table down to the given work ids with a
+    searchsorted probe over raw arrays: O(M log N) tight loops, no per-call
+    hash set. When both sides share the categorical work-id dtype the probe
+    runs on the integer codes; otherwise it falls back to the raw values.
+    """
+    if (
+        isinstance(edges.index.dtype, pd.CategoricalDtype)
+        and getattr(work_ids, "dtype", None) == edges.index.dtype
+    ):
+        edge_ids = np.asarray(edges.index.codes)
+        ids = np.sort(np.asarray(work_ids.cat.codes))
+    else:
+        edge_ids = edges.index.to_numpy()
+        ids = np.sort(np.asarray(work_ids))
+    if len(ids) == 0 or len(edge_ids) == 0:
+        return edges.iloc[:0]
+    pos = np.searchsorted(ids, edge_ids)
+    np.clip(pos, 0, len(ids) - 1, out=pos)
+    return edges[ids[pos] == edge_ids]
+
+def build_concept_index(works: pd.DataFrame):
+    """
+    Builds a flat (row-position, concept-code) membership index over the
+    nested all_top_concepts column — effectively a sparse works × concepts
+    matrix in COO form, kept as two parallel int32 arrays so filtering by
+    concept is one vectorized np.isin pass instead of a Python scan of
+    nested lists. Built with explode + factorize, so constructing it is
+    vectorized too. Returns (concept_to_code, rows, codes).
+    """
+    empty = np.empty(0, dtype=np.int32)
+    if "all_top_concepts" not in works.columns:
+        return {}, empty, empty
+
+    exploded = works["all_top_concepts"].reset_index(drop=True).explode().dropna()
+    exploded = exploded[exploded.map(lambda c: isinstance(c, dict))]
+    if exploded.empty:
+        return {}, empty, empty
+
+    names = pd.json_normalize(exploded)["name"]
+    codes, uniques = pd.factorize(names)
+    keep = codes >= 0  # factorize marks NaN names as -1
+    concept_to_code = {name: i for i, name in enumerate(uniques)}
+    return (
+        concept_to_code,
+        exploded.index.to_numpy()[keep].astype(np.int32),
+        codes[keep].astype(np.int32),
+    )
 
 def load_all():
     """
     Convenience loader for the dashboard. Returns all processed tables
     optimized with categorical data types for maximum filtering speed.
     """
-    works = load_processed("works.parquet")
+    # The dashboard never reads the raw collab_* list columns — the edge
+    # tables carry that information — so their (heavy, nested) column
+    # chunks are never even decoded.
+    works = load_processed("works.parquet", columns=[
+        "id", "title", "year", "type", "is_oa", "oa_status",
+        "cited_by_count", "top_concept", "concept_level",
+        "all_top_concepts", "author_count", "source_name",
+    ])
     country_edges = load_processed("country_edges.parquet")
     institution_edges = load_processed("institution_edges.parquet")
-    
+
+    # --- Backfill derived scalar columns for older caches ---
+    # transform_works materializes top_concept at ETL time; if an older
+    # works.parquet predates that column, derive it once here rather than
+    # ever touching the nested lists per request.
+    if "top_concept" not in works.columns and "all_top_concepts" in works.columns:
+        works["top_concept"] = [
+            L[0]["name"] if not (L is None or isinstance(L, float)) and len(L) else None
+            for L in works["all_top_concepts"]
+        ]
+
+    # --- Downcast numeric columns ---
+    # year fits int16 and the counts fit unsigned 32-bit; groupby scans on
+    # big frames are bandwidth-bound, so fewer bytes per value is a direct
+    # win. New caches already carry the small dtypes (transform casts them
+    # before writing); this covers caches written before that.
+    if "year" in works.columns:
+        works["year"] = pd.to_numeric(works["year"], downcast="integer")
+    for c in ("cited_by_count", "author_count", "referenced_works_count"):
+        if c in works.columns:
+            works[c] = pd.to_numeric(works[c], downcast="unsigned")
+    if "is_oa" in works.columns and not works["is_oa"].isna().any():
+        works["is_oa"] = works["is_oa"].astype(bool)
+
+    # --- Shared categorical dtype for work ids ---
+    # Every join/filter between works and the edge tables keys on these, and
+    # as object strings each comparison re-hashes a long OpenAlex URL. One
+    # CategoricalDtype shared across all three tables turns those into int
+    # code comparisons; stripping the URL prefix also shrinks the categories.
+    prefix = "https://openalex.org/"
+    works["id"] = works["id"].astype(str).str.removeprefix(prefix)
+    work_id_dtype = pd.CategoricalDtype(works["id"].unique())
+    works["id"] = works["id"].astype(work_id_dtype)
+    for edges in (country_edges, institution_edges):
+        if "work_id" in edges.columns:
+            edges["work_id"] = (
+                edges["work_id"].astype(str).str.removeprefix(prefix)
+                .astype(work_id_dtype)
+            )
+
     # --- Convert heavy text columns to categories ---
-    
+
     # Optimize Works table
     if "type" in works.columns:
         works["type"] = works["type"].astype("category")
     if "oa_status" in works.columns:
         works["oa_status"] = works["oa_status"].astype("category")
+    if "source_name" in works.columns:
+        works["source_name"] = works["source_name"].astype("category")
         
     # Optimize Country Edges
     if "country_code" in country_edges.columns:
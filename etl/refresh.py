@@ -1,27 +1,50 @@
 # etl/refresh.py
 from etl.extract import fetch_works
-from etl.transform import transform_works, build_country_edges, build_institution_edges
-from etl.load import save_processed, save_raw # Imported save_raw
+from etl.transform import transform_works_from_parquet, build_country_edges, build_institution_edges
+from etl.load import save_processed, save_filter_options, save_default_figures
 
 def full_refresh():
     print("Starting data refresh...")
-    raw = fetch_works(start_year=2020)
-    
-    # --- THE FIX ---
-    # Save the raw data immediately. If the transform fails, the data is safe on disk!
-    save_raw(raw, "works_raw.parquet") 
+    # fetch_works streams each page straight to disk as it arrives, so the
+    # raw data is safe even if the transform fails — and memory stays at
+    # one page instead of the whole corpus
+    raw_path = fetch_works(start_year=2020)
     print("Extract complete. Transforming data...")
-    # ---------------
-    
-    df = transform_works(raw)
+
+    df = transform_works_from_parquet(raw_path)
     country_df = build_country_edges(df)
     inst_df = build_institution_edges(df)
     
     save_processed(df, "works.parquet")
     save_processed(country_df, "country_edges.parquet")
     save_processed(inst_df, "institution_edges.parquet")
-    
+    save_filter_options(df)  # tiny JSON the layout reads instead of the full table
+    bake_default_figures(df)
+
     print(f"Refresh complete. {len(df)} works saved.")
 
+def bake_default_figures(df):
+    """
+    Prebuilds the Overview figures for the default filter state (the view
+    every session lands on) and gzips them into the processed cache, so the
+    dashboard's first paint is a file read instead of a pandas pass.
+    """
+    # Imported here: the chart builders live dashboard-side and aren't
+    # needed for the rest of the ETL
+    from dashboard.components.summary_stats import (
+        build_annual_output_chart, build_discipline_breakdown_chart,
+        build_oa_trend_chart, build_type_pie_chart,
+    )
+    from dashboard.layout import DEFAULT_YEAR_RANGE
+
+    lo, hi = DEFAULT_YEAR_RANGE
+    default = df[(df["year"] >= lo) & (df["year"] <= hi)]
+    save_default_figures({
+        "annual_output": build_annual_output_chart(default),
+        "discipline_breakdown": build_discipline_breakdown_chart(default),
+        "oa_trend": build_oa_trend_chart(default),
+        "type_pie": build_type_pie_chart(default),
+    })
+
 if __name__ == "__main__":      
     full_refresh()
\ No newline at end of file
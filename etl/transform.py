@@ -1,140 +1,205 @@
 import pandas as pd
+import pyarrow.parquet as pq
 
-def extract_concepts(concepts, top_n=5):
-    # Safely catch None, Pandas NaN (float), or empty arrays/lists
-    if concepts is None or isinstance(concepts, float) or len(concepts) == 0:
-        return []
-    
-    # Sort safely, ensuring we are dealing with dictionaries
-    sorted_concepts = sorted(
-        concepts, 
-        key=lambda x: x.get("score", 0) if isinstance(x, dict) else 0, 
-        reverse=True
+UOFT_ID = "I185261750"
+
+def _top_concepts(base, top_n=5):
+    """
+    Builds the top-N concept columns from the exploded concepts lists.
+    Returns (all_top_concepts, top_concept, concept_level) Series aligned
+    to base.index.
+    """
+    empty = pd.Series([None] * len(base), index=base.index)
+    if "concepts" not in base.columns:
+        return empty.map(lambda _: []), empty, empty
+
+    ex = base["concepts"].explode()
+    ex = ex[ex.map(lambda c: isinstance(c, dict))]
+    if ex.empty:
+        return empty.map(lambda _: []), empty, empty
+
+    cd = pd.json_normalize(ex)[["display_name", "level", "score"]]
+    cd.columns = ["name", "level", "score"]
+    cd["row"] = ex.index.to_numpy()
+
+    # Stable sort: score descending within each work, then keep the top N
+    cd = cd.sort_values(["row", "score"], ascending=[True, False], kind="stable")
+    top = cd.groupby("row", sort=False).head(top_n)
+
+    records = pd.Series(top[["name", "level", "score"]].to_dict("records"),
+                        index=top["row"].to_numpy())
+    all_top = records.groupby(level=0, sort=False).agg(list).reindex(base.index)
+    all_top = all_top.map(lambda v: v if isinstance(v, list) else [])
+
+    first = top.groupby("row", sort=False).first()
+    return (
+        all_top,
+        first["name"].reindex(base.index),
+        first["level"].reindex(base.index),
     )
-    
-    top_concepts = []
-    for c in sorted_concepts[:top_n]:
-        if isinstance(c, dict):
-            top_concepts.append({
-                "name": c.get("display_name"),
-                "level": c.get("level"),
-                "score": c.get("score")
-            })
-            
-    return top_concepts
-
-def extract_countries(authorships, exclude_institution_id="I185261750"):
-    countries = []
-    if authorships is None or isinstance(authorships, float) or len(authorships) == 0:
-        return countries
-        
-    for authorship in authorships:
-        if not isinstance(authorship, dict): 
-            continue
-        for inst in authorship.get("institutions", []):
-            if not isinstance(inst, dict): 
-                continue
-                
-            inst_id = inst.get("id") or ""  
-            if inst_id.split("/")[-1] != exclude_institution_id:
-                country = inst.get("country_code")
-                if country:
-                    countries.append(country)
-    return list(set(countries))
-
-def extract_institutions(authorships, exclude_id="I185261750"):
-    institutions = []
-    if authorships is None or isinstance(authorships, float) or len(authorships) == 0:
-        return institutions
-        
-    for authorship in authorships:
-        if not isinstance(authorship, dict): 
-            continue
-        for inst in authorship.get("institutions", []):
-            if not isinstance(inst, dict): 
-                continue
-                
-            inst_id = inst.get("id") or ""
-            if inst_id.split("/")[-1] != exclude_id:
-                institutions.append({
-                    "name": inst.get("display_name"),
-                    "country": inst.get("country_code"),
-                    "ror": inst.get("ror"),
-                    "openalex_id": inst.get("id")
-                })
-    return institutions
+
+def _collab_institutions(base):
+    """
+    Explodes authorships -> institutions and drops UofT itself.
+    Returns a long DataFrame with columns (row, name, country, ror,
+    openalex_id), one row per non-UofT institution mention.
+    """
+    if "authorships" not in base.columns:
+        return pd.DataFrame(columns=["row", "name", "country", "ror", "openalex_id"])
+
+    auth = base["authorships"].explode()
+    auth = auth[auth.map(lambda a: isinstance(a, dict))]
+    # institutions may be None or (after a parquet round-trip) an ndarray,
+    # so avoid `or []` which is ambiguous for arrays
+    insts = auth.map(lambda a: a.get("institutions")).explode()
+    insts = insts[insts.map(lambda i: isinstance(i, dict))]
+    if insts.empty:
+        return pd.DataFrame(columns=["row", "name", "country", "ror", "openalex_id"])
+
+    idf = pd.json_normalize(insts)
+    idf["row"] = insts.index.to_numpy()
+
+    # endswith instead of rsplit: no per-row list allocation. The "/" guard
+    # (plus the bare-id check) keeps this exactly equivalent to comparing
+    # the last URL path segment.
+    inst_ids = idf.get("id", pd.Series("", index=idf.index)).fillna("").astype(str)
+    is_uoft = inst_ids.str.endswith("/" + UOFT_ID) | (inst_ids == UOFT_ID)
+    idf = idf[~is_uoft]
+
+    return pd.DataFrame({
+        "row": idf["row"].to_numpy(),
+        "name": idf.get("display_name"),
+        "country": idf.get("country_code"),
+        "ror": idf.get("ror"),
+        "openalex_id": idf.get("id"),
+    }).reset_index(drop=True)
 
 def transform_works(raw_works):
-    """Flatten raw OpenAlex works into a tidy DataFrame."""
-    rows = []
-    for w in raw_works:
-        # Get the list of top 5 concepts
-        top_concepts_list = extract_concepts(w.get("concepts", []), top_n=5)
-        
-        primary_concept = top_concepts_list[0]["name"] if top_concepts_list else None
-        primary_concept_level = top_concepts_list[0]["level"] if top_concepts_list else None
-        
-        collab_countries = extract_countries(w.get("authorships", []))
-        collab_institutions = extract_institutions(w.get("authorships", []))
-        
-        # Safely navigate the nested dictionaries. 
-        # If 'primary_location' or 'source' are explicitly None, 'or {}' catches it.
-        primary_loc = w.get("primary_location") or {}
-        source_dict = primary_loc.get("source") or {}
-        source_name = source_dict.get("display_name")
-        # ---------------
-        
-        rows.append({
-            "id": w.get("id"),
-            "title": w.get("title"),
-            "year": w.get("publication_year"),
-            "type": w.get("type"),
-            "is_oa": w.get("open_access", {}).get("is_oa"),
-            "oa_status": w.get("open_access", {}).get("oa_status"),
-            "cited_by_count": w.get("cited_by_count", 0),
-            "top_concept": primary_concept,
-            "concept_level": primary_concept_level,
-            "all_top_concepts": top_concepts_list, 
-            "collab_countries": collab_countries,      
-            "collab_institutions": collab_institutions, 
-            "author_count": len(w.get("authorships", [])),
-            "source_name": source_name,
-        })
-    
-    return pd.DataFrame(rows)
+    """
+    Flatten raw OpenAlex works into a tidy DataFrame.
+    Fully vectorized: one json_normalize pass pulls the scalar and nested
+    scalar fields, and the list columns (concepts, authorships) go through
+    explode + json_normalize pipelines instead of a per-work Python loop.
+    """
+    base = pd.json_normalize(raw_works)
+    if base.empty:
+        return pd.DataFrame()
+
+    def col(name, default=None):
+        # Dotted columns vanish from json_normalize output when the parent
+        # is null on every record — fall back to a constant column
+        if name in base.columns:
+            return base[name]
+        return pd.Series([default] * len(base), index=base.index)
+
+    all_top_concepts, top_concept, concept_level = _top_concepts(base, top_n=5)
+
+    inst_long = _collab_institutions(base)
+
+    # Unique countries per work, first-seen order, skipping blanks
+    cc = inst_long[["row", "country"]].dropna(subset=["country"])
+    cc = cc[cc["country"] != ""].drop_duplicates()
+    collab_countries = (
+        cc.groupby("row", sort=False)["country"].agg(list)
+        .reindex(base.index)
+        .map(lambda v: v if isinstance(v, list) else [])
+    )
+
+    # Institution dicts per work, same shape as before
+    inst_records = pd.Series(
+        inst_long[["name", "country", "ror", "openalex_id"]].to_dict("records"),
+        index=inst_long["row"].to_numpy(), dtype=object,
+    )
+    collab_institutions = (
+        inst_records.groupby(level=0, sort=False).agg(list)
+        .reindex(base.index)
+        .map(lambda v: v if isinstance(v, list) else [])
+    )
+
+    author_count = (
+        col("authorships").str.len().fillna(0).astype(int)
+        if "authorships" in base.columns
+        else pd.Series(0, index=base.index)
+    )
+
+    return pd.DataFrame({
+        "id": col("id"),
+        "title": col("title"),
+        # downcast: year fits int16, the counts fit unsigned — persisting
+        # the small dtypes here means every reader gets them for free
+        "year": pd.to_numeric(col("publication_year"), downcast="integer"),
+        "type": col("type"),
+        "is_oa": col("open_access.is_oa"),
+        "oa_status": col("open_access.oa_status"),
+        "cited_by_count": pd.to_numeric(col("cited_by_count", 0).fillna(0), downcast="unsigned"),
+        "top_concept": top_concept,
+        "concept_level": concept_level,
+        "all_top_concepts": all_top_concepts,
+        "collab_countries": collab_countries,
+        "collab_institutions": collab_institutions,
+        "author_count": pd.to_numeric(author_count, downcast="unsigned"),
+        "source_name": col("primary_location.source.display_name"),
+    })
+
+def transform_works_from_parquet(path, batch_size=10_000, workers=None):
+    """
+    Streams a raw works parquet through transform_works one row-group batch
+    at a time, so the full raw record list never sits in memory at once.
+    Pass workers > 1 to flatten batches in a process pool — the transform
+    is vectorized so this rarely pays off below a few hundred thousand
+    works, but batches are independent so it scales across cores.
+    """
+    parquet_file = pq.ParquetFile(path)
+    batches = (
+        batch.to_pylist()
+        for batch in parquet_file.iter_batches(batch_size=batch_size)
+    )
+    if workers and workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(transform_works, batches))
+    else:
+        parts = [transform_works(batch) for batch in batches]
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts, ignore_index=True)
 
 def build_country_edges(df):
     """
     Creates a long-format DataFrame for the choropleth map.
     Now includes granular concept data for advanced filtering.
+    Pure explode pipeline — one country per output row, no Python loop.
     """
-    rows = []
-    for _, row in df.iterrows():
-        for country in row["collab_countries"]:
-            rows.append({
-                "work_id": row["id"],
-                "year": row["year"],
-                "country_code": country,
-                "top_concept": row["top_concept"],
-                "all_top_concepts": row["all_top_concepts"] # Added this
-            })
-    return pd.DataFrame(rows)
+    out = (
+        df[["id", "year", "collab_countries", "top_concept", "all_top_concepts"]]
+        .rename(columns={"id": "work_id", "collab_countries": "country_code"})
+        .explode("country_code", ignore_index=True)
+        .dropna(subset=["country_code"])   # works with no collaborations
+        .reset_index(drop=True)
+    )
+    return out
 
 def build_institution_edges(df):
     """
     Creates edges for network graph: UofT -> collaborating institution.
     Now includes concept data so the network can be filtered by topic.
+    Explode + json_normalize instead of a per-row Python loop.
     """
-    rows = []
-    for _, row in df.iterrows():
-        for inst in row["collab_institutions"]:
-            rows.append({
-                "source": "University of Toronto",
-                "target": inst["name"],
-                "target_country": inst["country"],
-                "year": row["year"],
-                "work_id": row["id"],
-                "top_concept": row["top_concept"],          # Added this
-                "all_top_concepts": row["all_top_concepts"] # Added this
-            })
-    return pd.DataFrame(rows)
\ No newline at end of file
+    out = (
+        df[["id", "year", "top_concept", "all_top_concepts", "collab_institutions"]]
+        .rename(columns={"id": "work_id"})
+        .explode("collab_institutions", ignore_index=True)
+        .dropna(subset=["collab_institutions"])
+        .reset_index(drop=True)
+    )
+    if out.empty:
+        return pd.DataFrame()
+
+    # Unpack the institution dicts in one C pass and lay the columns back in
+    inst = pd.json_normalize(out.pop("collab_institutions"))
+    out["source"] = "University of Toronto"
+    out["target"] = inst["name"].values
+    out["target_country"] = inst["country"].values
+
+    return out[["source", "target", "target_country", "year",
+                "work_id", "top_concept", "all_top_concepts"]]
\ No newline at end of file
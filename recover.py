@@ -1,19 +1,15 @@
 # recover.py
 import pandas as pd
-from etl.transform import transform_works, build_country_edges, build_institution_edges
+from etl.transform import transform_works_from_parquet, build_country_edges, build_institution_edges
 from etl.load import save_processed
 
 def run_recovery():
     print("Loading raw data from disk... (skipping API fetch)")
-    
-    # Load the parquet file we saved right before the crash
-    raw_df = pd.read_parquet("data/raw/works_raw.parquet")
-    
-    # Convert it back to a list of dictionaries for the transform functions
-    raw_works = raw_df.to_dict(orient="records")
-    
+
     print("Transforming data...")
-    df = transform_works(raw_works)
+    # Stream the crash-saved parquet through the transform in row-group
+    # batches rather than materializing every raw record at once
+    df = transform_works_from_parquet("data/raw/works_raw.parquet")
     country_df = build_country_edges(df)
     inst_df = build_institution_edges(df)
     